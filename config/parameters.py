@@ -4,10 +4,14 @@ and embedding model instances used for the interview helper chatbot.
 
 It loads model configuration from environment variables and provides
 convenient functions to get the ChatOpenAI and OpenAIEmbeddings objects.
+
+The public getters are cached with `st.cache_resource`, so a single client
+is shared across Streamlit reruns and sessions.
 """
 
 import os
 
+import streamlit as st
 from dotenv import load_dotenv
 
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
@@ -15,13 +19,25 @@ from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 load_dotenv()
 MODEL = os.getenv('MODEL')
 EMBEDDING = os.getenv('EMBEDDING')
+# Add arxiv/wikipedia results for the selected keywords to the question context.
+# Off by default: the lookups add seconds to the first question of a session.
+USE_LOOKUP_TOOLS = os.getenv('USE_LOOKUP_TOOLS', 'false').lower() == 'true'
 
 DB_PATH = "vectorstore/index"
 
+# Chunk size of uploaded documents, in cl100k_base tokens. Chunks do not
+# overlap: overlap barely helps retrieval but adds chunks to embed and store.
+CHUNK_SIZE = 512
+CHUNK_OVERLAP = 0
 
-def get_llm():
+# Texts per embeddings request. 512 chunks of at most CHUNK_SIZE tokens stay under
+# the API's per-request token limit, so an upload needs only a few round-trips.
+EMBEDDING_BATCH_SIZE = 512
+
+
+def _build_llm():
     """
-    Create and return a ChatOpenAI instance with specified model and zero temperature.
+    Create a ChatOpenAI instance with the configured model and low temperature.
     """
     return ChatOpenAI(
         model=MODEL,
@@ -29,8 +45,28 @@ def get_llm():
     )
 
 
+def _build_embeddings():
+    """
+    Create an OpenAIEmbeddings instance with the configured embedding model,
+    sending up to `EMBEDDING_BATCH_SIZE` texts per request.
+    """
+    return OpenAIEmbeddings(
+        model=EMBEDDING,
+        chunk_size=EMBEDDING_BATCH_SIZE
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_llm():
+    """
+    Return the shared ChatOpenAI instance, created once per process.
+    """
+    return _build_llm()
+
+
+@st.cache_resource(show_spinner=False)
 def get_embeddings():
     """
-    Create and return an OpenAIEmbeddings instance with the specified embedding model.
+    Return the shared OpenAIEmbeddings instance, created once per process.
     """
-    return OpenAIEmbeddings(model=EMBEDDING)
+    return _build_embeddings()
@@ -0,0 +1,46 @@
+"""
+Module for running document ingestion (loading, splitting, embedding and
+indexing an uploaded file) on a background thread, so the Streamlit script
+is not blocked while a document is processed.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from rag.loader import load_and_split_file
+from rag.vector_store import save_to_faiss
+
+
+@st.cache_resource(show_spinner=False)
+def _get_executor():
+    """
+    Return the process-wide single-worker executor, so index writes never overlap.
+    """
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest")
+
+
+def ingest_file(uploaded_file):
+    """
+    Split an uploaded file into chunks and save them to the FAISS vector store.
+
+    Args:
+        uploaded_file: A file-like object uploaded via Streamlit or similar.
+
+    Returns:
+        int: Number of new chunks saved; chunks already stored are skipped.
+
+    Raises:
+        ValueError: If the uploaded file type is not supported.
+    """
+    return save_to_faiss(load_and_split_file(uploaded_file))
+
+
+def submit_ingest(uploaded_file):
+    """
+    Schedule `ingest_file` for `uploaded_file` on the background executor.
+
+    Returns:
+        concurrent.futures.Future: Future resolving to the number of new chunks saved.
+    """
+    return _get_executor().submit(ingest_file, uploaded_file)
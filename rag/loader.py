@@ -1,46 +1,96 @@
 """
 Module for loading and splitting uploaded text or PDF files into smaller chunks
 using LangChain document loaders and text splitter.
+
+Parsing results of the most recent uploads are cached with `st.cache_data` on
+the file contents, so re-uploading one of them does not parse it again.
 """
-import tempfile
 import os
 
-from langchain_community.document_loaders import TextLoader, PyMuPDFLoader
+import fitz
+import streamlit as st
+from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+from config.parameters import CHUNK_OVERLAP, CHUNK_SIZE
+
 
 def load_and_split_file(uploaded_file):
     """
     Load an uploaded text or PDF file, then split its content into smaller chunks.
 
     The function:
-    - Saves the uploaded file temporarily
-    - Uses appropriate LangChain document loader based on file extension
-    - Splits the loaded document into chunks using RecursiveCharacterTextSplitter
+    - Parses PDFs in memory with PyMuPDF, one document per page
+    - Decodes text and markdown files in memory as UTF-8, as a single document
+    - Splits the loaded document at paragraph, line and sentence boundaries into
+      chunks of at most `CHUNK_SIZE` tokens
 
     Args:
         uploaded_file: A file-like object uploaded via Streamlit or similar,
-                       with attributes like `.name` and `.read()` method.
+                       with a `.name` attribute and a `.getvalue()` method.
 
     Returns:
-        List of document chunks split by RecursiveCharacterTextSplitter.
+        List of document chunks.
 
     Raises:
         ValueError: If the uploaded file type is not supported (not pdf, txt, or md).
     """
     suffix = os.path.splitext(uploaded_file.name)[-1].lower()
+    return _load_and_split(uploaded_file.getvalue(), suffix, uploaded_file.name)
+
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-        tmp_file.write(uploaded_file.read())
-        tmp_path = tmp_file.name
+@st.cache_data(show_spinner=False, max_entries=8)
+def _load_and_split(file_bytes, suffix, name):
+    """
+    Parse `file_bytes` with the loader matching `suffix` and split the result.
+
+    Args:
+        file_bytes (bytes): Raw contents of the uploaded file.
+        suffix (str): Lower-cased file extension, including the dot.
+        name (str): Original file name, kept as the source of text documents.
 
+    Returns:
+        List of document chunks.
+
+    Raises:
+        ValueError: If the file type is not supported (not pdf, txt, or md).
+    """
     if suffix == ".pdf":
-        loader = PyMuPDFLoader(tmp_path)
+        documents = _load_pdf(file_bytes)
     elif suffix in [".txt", ".md"]:
-        loader = TextLoader(tmp_path)
+        documents = _load_text(file_bytes, name)
     else:
         raise ValueError("지원하지 않는 파일 형식입니다.")
 
-    documents = loader.load()
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+    text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name="cl100k_base",
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        separators=["\n\n", "\n", ". ", "! ", "? ", " ", ""]
+        )
     return text_splitter.split_documents(documents)
+
+
+def _load_pdf(file_bytes):
+    """
+    Parse a PDF straight from memory with PyMuPDF, without a temporary file.
+
+    Returns:
+        List of documents, one per page, with the page index in the metadata.
+    """
+    with fitz.open(stream=file_bytes, filetype="pdf") as pdf:
+        return [
+            Document(page_content=page.get_text(),
+                     metadata={"page": i, "total_pages": pdf.page_count})
+            for i, page in enumerate(pdf)
+        ]
+
+
+def _load_text(file_bytes, name):
+    """
+    Decode a UTF-8 text or markdown file straight from memory, without a temporary file.
+
+    Returns:
+        List with a single document, with the file name as its source.
+    """
+    return [Document(page_content=file_bytes.decode("utf-8"), metadata={"source": name})]
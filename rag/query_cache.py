@@ -0,0 +1,102 @@
+"""
+Module providing an in-memory LRU cache with TTL for retrieval results.
+
+Entries are keyed on the normalized query and also keep the query embedding,
+so a new query whose embedding is close enough to a cached one can reuse its
+documents without another vector search.
+"""
+
+import time
+from collections import OrderedDict
+from threading import RLock
+
+import numpy as np
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache mapping queries to retrieved documents.
+
+    Args:
+        max_size (int): Maximum number of cached queries.
+        ttl (float): Seconds after which an entry expires.
+        similarity_threshold (float): Minimum cosine similarity between query
+            embeddings for a cached entry to be reused on a key miss.
+    """
+
+    def __init__(self, max_size=256, ttl=300.0, similarity_threshold=0.95):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._entries = OrderedDict()
+        self._lock = RLock()
+
+    def get(self, key):
+        """
+        Return the documents cached under `key`, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, documents = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return documents
+
+    def get_similar(self, embedding, key_filter=None):
+        """
+        Return the documents of the most similar cached query, or None if no
+        cached query reaches the similarity threshold.
+
+        If `key_filter` is given, only entries whose key it accepts are considered.
+        """
+        query = _normalize(embedding)
+        now = time.monotonic()
+        with self._lock:
+            best_key, best_score = None, self.similarity_threshold
+            for key, (expires_at, cached, _) in list(self._entries.items()):
+                if expires_at < now:
+                    del self._entries[key]
+                    continue
+                if key_filter is not None and not key_filter(key):
+                    continue
+                score = float(np.dot(query, cached))
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][2]
+
+    def put(self, key, embedding, documents):
+        """
+        Cache `documents` under `key` together with the query embedding.
+        """
+        with self._lock:
+            self._entries[key] = (
+                time.monotonic() + self.ttl,
+                _normalize(embedding),
+                tuple(documents),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Drop every cached entry, e.g. after the underlying index changed.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+def _normalize(embedding):
+    """
+    Return `embedding` as a unit-length float32 vector.
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
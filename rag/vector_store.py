@@ -1,24 +1,220 @@
 """
-Module for saving and loading document embeddings using FAISS vector store.
+Module for saving and loading document embeddings using FAISS vector store,
+and for cached keyword searches over it.
 """
 
+import hashlib
 import os
+import pickle
 
+import faiss
+import numpy as np
+import streamlit as st
+from langchain.schema import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 
 from config.parameters import DB_PATH, get_embeddings
+from rag.query_cache import QueryCache
+
+__all__ = ["save_to_faiss", "index_version", "load_faiss", "search_by_keywords"]
+
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "index.pkl"
+
+TOP_K = 3
+# Candidates fetched per search, so TOP_K remain after dropping near-duplicates.
+FETCH_K = 2 * TOP_K
+# Leading characters compared to detect near-duplicate chunks (e.g. repeated headers).
+DEDUP_PREFIX_LENGTH = 200
+HNSW_MIN_VECTORS = 5_000
+PQ_MIN_VECTORS = 100_000
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+IVF_NPROBE = 16
+
+faiss.omp_set_num_threads(os.cpu_count() or 1)
+
+_query_cache = QueryCache(max_size=256, ttl=300.0)
 
 
 def save_to_faiss(documents):
     """
-    Save a list of documents to a local FAISS vector store.
+    Add a list of documents to the local FAISS vector store, creating it if needed.
+
+    Each chunk is tagged with the SHA-1 of its content; chunks already in the
+    store (or repeated within `documents`) are skipped. If the new size calls for
+    a different index type, the index is rebuilt from its stored vectors.
 
     Args:
         documents (list): List of documents to be embedded and saved.
+
+    Returns:
+        int: Number of chunks actually added.
     """
+    db = _read_store(DB_PATH) if os.path.exists(os.path.join(DB_PATH, INDEX_FILE)) else None
+    known_hashes = set() if db is None else {
+        db.docstore.search(doc_id).metadata.get("content_hash")
+        for doc_id in db.index_to_docstore_id.values()
+    }
 
-    db = FAISS.from_documents(documents, embedding=get_embeddings())
-    db.save_local(DB_PATH)
+    new_documents = []
+    for doc in documents:
+        content_hash = hashlib.sha1(doc.page_content.encode("utf-8"),
+                                    usedforsecurity=False).hexdigest()
+        if content_hash not in known_hashes:
+            known_hashes.add(content_hash)
+            new_documents.append(Document(page_content=doc.page_content,
+                                          metadata={**doc.metadata, "content_hash": content_hash}))
+    if not new_documents:
+        return 0
+
+    texts = [doc.page_content for doc in new_documents]
+    vectors = np.asarray(get_embeddings().embed_documents(texts), dtype=np.float32)
+    faiss.normalize_L2(vectors)
+
+    if db is None:
+        db = _wrap_index(_create_index(vectors), InMemoryDocstore(), {})
+    else:
+        _resize_index(db, vectors)
+    db.add_embeddings(
+        list(zip(texts, vectors)),
+        metadatas=[doc.metadata for doc in new_documents]
+        )
+    _write_store(db, DB_PATH)
+    _load_index.clear()
+    _query_cache.clear()
+    return len(new_documents)
+
+
+def _resize_index(db, vectors):
+    """
+    Swap the index of `db` for one sized for its vectors plus `vectors`, if the
+    index type for the new total differs. Stored vectors are reconstructed from
+    the current index and re-added in the same order, so docstore positions hold.
+    """
+    count, dim = db.index.ntotal, db.index.d
+    if _index_factory_spec(count, dim) == _index_factory_spec(count + len(vectors), dim):
+        return
+
+    ivf = faiss.try_extract_index_ivf(db.index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    stored = db.index.reconstruct_n(0, count)
+    index = _create_index(np.vstack([stored, vectors]))
+    index.add(stored)
+    db.index = index
+
+
+def _index_factory_spec(count, dim):
+    """
+    Return the `faiss.index_factory` description for `count` vectors of size `dim`.
+
+    Small corpora use exact flat search, mid-sized ones an HNSW graph over 8-bit
+    scalar-quantized vectors (a quarter of the float32 memory) and large ones
+    IVF with product quantization, about 32 bytes per vector.
+    """
+    if count < HNSW_MIN_VECTORS:
+        return "Flat"
+    if count < PQ_MIN_VECTORS or dim % 32:
+        return "HNSW32,SQ8"
+    return "IVF1024,PQ32"
+
+
+def _create_index(vectors):
+    """
+    Create an empty inner-product FAISS index sized for `vectors` and train it on them.
+
+    Args:
+        vectors (np.ndarray): L2-normalized float32 matrix of shape (N, dim).
+
+    Returns:
+        faiss.Index: Trained, empty index ready for `add`.
+    """
+    count, dim = vectors.shape
+    index = faiss.index_factory(dim, _index_factory_spec(count, dim), faiss.METRIC_INNER_PRODUCT)
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    if not index.is_trained:
+        index.train(vectors)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = IVF_NPROBE
+    return index
+
+
+def _wrap_index(index, docstore, index_to_docstore_id):
+    """
+    Wrap a raw FAISS index and its docstore in a LangChain FAISS store ranking
+    by inner product. Vectors are expected to be L2-normalized by the caller,
+    once at ingest and once per query, so inner product equals cosine similarity.
+    """
+    return FAISS(
+        embedding_function=get_embeddings(),
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id,
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
+
+
+def _write_store(db, path):
+    """
+    Write the index and the pickled docstore of `db` into `path`.
+
+    Both files are written under a temporary name first and then renamed over
+    the previous ones, so readers that mapped the old index keep a valid file.
+    """
+    os.makedirs(path, exist_ok=True)
+    index_path = os.path.join(path, INDEX_FILE)
+    docstore_path = os.path.join(path, DOCSTORE_FILE)
+
+    faiss.write_index(db.index, index_path + ".tmp")
+    with open(docstore_path + ".tmp", "wb") as file:
+        pickle.dump((db.docstore, db.index_to_docstore_id), file)
+    os.replace(docstore_path + ".tmp", docstore_path)
+    os.replace(index_path + ".tmp", index_path)
+
+
+def _read_store(path, io_flags=0):
+    """
+    Read the index and the pickled docstore in `path` into a FAISS store.
+
+    With the default flags the index is fully loaded and can be modified.
+    """
+    index = faiss.read_index(os.path.join(path, INDEX_FILE), io_flags)
+    with open(os.path.join(path, DOCSTORE_FILE), "rb") as file:
+        docstore, index_to_docstore_id = pickle.load(file)
+    return _wrap_index(index, docstore, index_to_docstore_id)
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_index(path, mtime):  # pylint: disable=unused-argument
+    """
+    Open the FAISS vector store at `path` with a read-only, memory-mapped index.
+
+    `IO_FLAG_MMAP_IFC` maps the whole file, so flat and HNSW indexes are shared
+    through the page cache too; `IO_FLAG_MMAP` alone would only map IVF lists.
+    `mtime` is only part of the cache key, so a rewritten index is reloaded.
+    The returned store must not be modified.
+    """
+    return _read_store(path, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+
+
+def index_version():
+    """
+    Return a value identifying the current contents of the vector store.
+
+    Returns:
+        float | None: Modification time of the stored index, or None if no
+        document has been uploaded yet.
+    """
+    try:
+        return os.path.getmtime(os.path.join(DB_PATH, INDEX_FILE))
+    except FileNotFoundError:
+        return None
 
 
 def load_faiss():
@@ -34,8 +230,60 @@ def load_faiss():
     if not os.path.exists(DB_PATH):
         raise FileNotFoundError("FAISS 인덱스가 존재하지 않습니다. 문서를 먼저 업로드하세요.")
 
-    return FAISS.load_local(
-        folder_path=DB_PATH,
-        embeddings=get_embeddings(),
-        allow_dangerous_deserialization=True
+    return _load_index(DB_PATH, os.path.getmtime(os.path.join(DB_PATH, INDEX_FILE)))
+
+
+def _unique_documents(documents):
+    """
+    Keep the first `TOP_K` documents whose first `DEDUP_PREFIX_LENGTH`
+    characters differ from those of every document kept before them.
+    """
+    seen = set()
+    unique = []
+    for doc in documents:
+        prefix_hash = hash(doc.page_content[:DEDUP_PREFIX_LENGTH])
+        if prefix_hash not in seen:
+            seen.add(prefix_hash)
+            unique.append(doc)
+            if len(unique) == TOP_K:
+                break
+    return tuple(unique)
+
+
+def search_by_keywords(keywords):
+    """
+    Retrieve the documents most relevant to a list of technical keywords.
+
+    Results are cached per keyword set and index version, so a search that
+    races with an upload cannot cache old results for the new index. On a
+    miss the joined keywords are embedded once, and that embedding is used
+    both to look for a similar cached query of the same version and for the
+    vector search itself. Chunks starting with the same text as a better match
+    are skipped, so the context holds no repeats.
+
+    Args:
+        keywords (list[str]): Technical keywords selected by the user.
+
+    Returns:
+        tuple: The top `TOP_K` matching documents.
+
+    Raises:
+        FileNotFoundError: If the FAISS index does not exist locally.
+    """
+    version = index_version()
+    key = (version, tuple(sorted(keywords)))
+    documents = _query_cache.get(key)
+    if documents is not None:
+        return documents
+
+    db = load_faiss()
+    embedding = get_embeddings().embed_query(" ".join(keywords))
+    documents = _query_cache.get_similar(
+        embedding, key_filter=lambda cached_key: cached_key[0] == version
         )
+    if documents is None:
+        query = np.asarray([embedding], dtype=np.float32)
+        faiss.normalize_L2(query)
+        documents = _unique_documents(db.similarity_search_by_vector(query[0], k=FETCH_K))
+    _query_cache.put(key, embedding, documents)
+    return documents
@@ -16,37 +16,46 @@ All UI rendering functions accept:
 - graph: The interview workflow StateGraph instance.
 """
 
-from langchain_core.messages import HumanMessage, AIMessage
-from langchain_community.chat_message_histories import ChatMessageHistory
+import hashlib
+import time
+import uuid
 
-from rag.loader import load_and_split_file
-from rag.vector_store import save_to_faiss
+from rag.ingest import submit_ingest
 
+STREAM_UPDATE_INTERVAL = 0.05
+INGEST_POLL_INTERVAL = 1.0
 
 
 def init_session(st):
     """
     Initialize all Streamlit session state variables for a fresh chatbot session.
 
+    The interview state itself is kept by the graph's checkpointer under a
+    per-session thread id; `graph_input` only holds the initial state until the
+    first question is generated.
+
     Args:
         st: The Streamlit module for session state management.
     """
     st.session_state.stage = "select_topic"
-    st.session_state.uploaded_file_name = None
+    st.session_state.uploaded_file_id = None
+    st.session_state.uploaded_file_hash = None
+    st.session_state.ingest_future = None
+    st.session_state.ingest_status = None
     st.session_state.selected_topics = []
     st.session_state.messages = []
-    st.session_state.questions = []
-    st.session_state.answers = []
-    st.session_state.feedbacks = []
 
-    st.session_state.memory = ChatMessageHistory()
-    st.session_state.graph_state = {
+    st.session_state.session_id = uuid.uuid4().hex
+    st.session_state.graph_input = {
         "messages": [],
+        "chat_history": [],
         "tech_keywords": "",
+        "tech_context": "",
+        "context_version": None,
         "is_summary": False,
         "user_input": ""
     }
-    st.session_state.graph_config = {"configurable": {"thread_id": "unique_session"}}
+    st.session_state.graph_config = {"configurable": {"thread_id": st.session_state.session_id}}
 
 
 def render_document_upload(st):
@@ -54,6 +63,10 @@ def render_document_upload(st):
     Render the sidebar UI to upload documents (pdf, txt, md)
     and save their chunks to the FAISS vector store.
 
+    Uploads are deduplicated on the SHA-1 of their contents, which is computed
+    once per uploaded file. Ingestion runs on a background thread; while it is
+    pending, its status is polled by a fragment, so the rest of the UI stays usable.
+
     Args:
         st: The Streamlit module for UI rendering.
     """
@@ -62,86 +75,172 @@ def render_document_upload(st):
         "이력서, 포트폴리오 등 질문받고 싶은 문서를 업로드하세요. (pdf, txt, md)",
         type=["pdf", "txt", "md"]
     )
-    if uploaded_file and uploaded_file.name != st.session_state.get("uploaded_file_name"):
-        with st.spinner("문서를 처리 중입니다..."):
-            chunks = load_and_split_file(uploaded_file)
-            save_to_faiss(chunks)
-            st.session_state.uploaded_file_name = uploaded_file.name
-            st.sidebar.success(f"{len(chunks)}개의 문서 청크가 벡터 DB에 저장되었습니다.")
-        st.rerun()
+    if uploaded_file and uploaded_file.file_id != st.session_state.uploaded_file_id:
+        st.session_state.uploaded_file_id = uploaded_file.file_id
+        file_hash = hashlib.sha1(uploaded_file.getvalue(), usedforsecurity=False).hexdigest()
+        if file_hash != st.session_state.uploaded_file_hash:
+            st.session_state.uploaded_file_hash = file_hash
+            st.session_state.ingest_future = submit_ingest(uploaded_file)
+            st.session_state.ingest_status = None
+
+    if st.session_state.ingest_future is not None:
+        with st.sidebar:
+            st.fragment(run_every=INGEST_POLL_INTERVAL)(render_ingest_status)(st)
+    elif st.session_state.ingest_status:
+        level, message = st.session_state.ingest_status
+        getattr(st.sidebar, level)(message)
+
+
+def render_ingest_status(st):
+    """
+    Show the progress of the background ingestion job.
+
+    Rendered as a fragment that reruns every `INGEST_POLL_INTERVAL` seconds;
+    once the job is done, its outcome is stored in `ingest_status` and the
+    whole app reruns to display it. A failed file may be uploaded again.
+
+    Args:
+        st: The Streamlit module for UI rendering.
+    """
+    future = st.session_state.ingest_future
+    if not future.done():
+        st.info("문서를 처리 중입니다...")
+        return
+
+    st.session_state.ingest_future = None
+    try:
+        st.session_state.ingest_status = (
+            "success", f"{future.result()}개의 문서 청크가 벡터 DB에 저장되었습니다."
+        )
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        # Corrupt files and embedding API errors must not escape the fragment.
+        st.session_state.ingest_status = ("error", f"문서 처리 중 오류가 발생했습니다: {error}")
+        # Forget the failed file, so uploading it again retries the ingest.
+        st.session_state.uploaded_file_hash = None
+    st.rerun()
 
 
 def render_select_topic(st):
     """
     Render UI for the user to input and select technical topics to practice.
 
+    The input lives in a form, so the script reruns only once the form is submitted.
+
     Args:
         st: The Streamlit module for UI rendering.
     """
-    tech_input = st.text_input("연습하고 싶은 기술을 입력하세요 (예: Java, SpringBoot, MySQL 등)")
-    if st.button("시작하기") and tech_input.strip():
+    with st.form("topic_form"):
+        tech_input = st.text_input("연습하고 싶은 기술을 입력하세요 (예: Java, SpringBoot, MySQL 등)")
+        submitted = st.form_submit_button("시작하기")
+    if submitted and tech_input.strip():
         st.session_state.selected_topics = [t.strip() for t in tech_input.split(",") if t.strip()]
         st.session_state.stage = "ask"
-        st.session_state.graph_state["tech_keywords"] = st.session_state.selected_topics
+        st.session_state.graph_input["tech_keywords"] = st.session_state.selected_topics
         st.rerun()
 
 
-def render_ask(st, graph):
+def render_ask(st, graph, history):
     """
-    Generate an interview question by invoking the graph at the 'ask' step,
-    display it, and update session state accordingly.
+    Generate an interview question by running the graph up to the 'ask' step,
+    stream it into the chat history container, and update session state accordingly.
+
+    The first call starts the graph from `graph_input`; later calls resume the
+    checkpointed thread, which continues from 'feedback' back to 'ask'.
 
     Args:
         st: The Streamlit module for UI rendering.
         graph: The workflow StateGraph instance managing the interview process.
+        history: The container holding the already rendered chat messages.
     """
-    question_prompt = graph.invoke(st.session_state.graph_state,
-                                   interrupt_after="ask",
-                                   config=st.session_state.graph_config)
-    st.session_state.graph_state = question_prompt
+    with history.chat_message("assistant"):
+        question_prompt = stream_graph(st, graph, st.session_state.graph_input, {"ask"},
+                                       interrupt_after="ask")
+    st.session_state.graph_input = None
     question = question_prompt["messages"][-1]["content"]
-    st.session_state.questions.append(question)
-    st.session_state.messages.append(AIMessage(content=question))
+    st.session_state.messages.append({"role": "assistant", "content": question})
     st.session_state.stage = "wait_answer"
-    st.rerun()
+
+
+def stream_graph(st, graph, graph_input, nodes, **kwargs):
+    """
+    Run the graph and write the LLM tokens produced by `nodes` into a placeholder
+    as they arrive, instead of blocking until the whole reply is generated.
+
+    Tokens are collected in a list and the placeholder is refreshed at most every
+    `STREAM_UPDATE_INTERVAL` seconds as plain text; markdown is rendered once,
+    from the final message stored in the graph state, when the run ends.
+
+    Args:
+        st: The Streamlit module for UI rendering.
+        graph: The workflow StateGraph instance managing the interview process.
+        graph_input: Input passed to the graph, or None to resume the current thread.
+        nodes (set[str]): Names of the graph nodes whose tokens are displayed.
+        **kwargs: Extra arguments for `graph.stream`, e.g. `interrupt_after`.
+
+    Returns:
+        dict: The graph state after the run.
+    """
+    placeholder = st.empty()
+    chunks = []
+    state = None
+    last_update = time.monotonic()
+    for mode, payload in graph.stream(graph_input,
+                                      config=st.session_state.graph_config,
+                                      stream_mode=["messages", "values"],
+                                      **kwargs):
+        if mode == "values":
+            state = payload
+            continue
+        chunk, metadata = payload
+        # Only model tokens; messages that nodes add to the state are streamed too.
+        if (chunk.type == "AIMessageChunk" and chunk.content
+                and metadata.get("langgraph_node") in nodes):
+            chunks.append(chunk.content)
+            if time.monotonic() - last_update > STREAM_UPDATE_INTERVAL:
+                placeholder.text("".join(chunks))
+                last_update = time.monotonic()
+    placeholder.markdown(state["messages"][-1]["content"])
+    return state
 
 
 def render_messages(st):
     """
     Render the chat messages (user and assistant) in the Streamlit chat UI.
 
+    Messages are stored as `{"role": ..., "content": ...}` dicts, tagged with
+    their role when appended.
+
     Args:
         st: The Streamlit module for UI rendering.
     """
-    if st.session_state.messages:
-        for message in st.session_state.messages:
-            role = "user" if isinstance(message, HumanMessage) else "assistant"
-            with st.chat_message(role):
-                st.markdown(message.content)
+    for message in st.session_state.messages:
+        st.chat_message(message["role"]).markdown(message["content"])
 
 
-def render_wait_answer(st, graph):
+def render_wait_answer(st, graph, history):
     """
     Display an input box for the user to answer the current question,
     send the answer to the graph for feedback generation, and update the session.
 
+    The answer and the streamed feedback are appended to the chat history container;
+    the app then reruns, so the chat input is not left on the page next to the
+    confirmation buttons, where an answer typed into it would be lost.
+
     Args:
         st: The Streamlit module for UI rendering.
         graph: The workflow StateGraph instance managing the interview process.
+        history: The container holding the already rendered chat messages.
     """
     user_input = st.chat_input("질문에 답변해보세요.", key="user_input")
     if user_input:
-        st.session_state.answers.append(user_input)
-        st.session_state.messages.append(HumanMessage(content=user_input))
-        st.session_state.graph_state["user_input"] = user_input
-        graph.update_state(values=st.session_state.graph_state,
+        st.session_state.messages.append({"role": "user", "content": user_input})
+        graph.update_state(values={"user_input": user_input},
                            config=st.session_state.graph_config)
-        response = graph.invoke(None, interrupt_after="feedback",
-                                config=st.session_state.graph_config)
-        st.session_state.graph_state = response
+        history.chat_message("user").markdown(user_input)
+        with history.chat_message("assistant"):
+            response = stream_graph(st, graph, None, {"feedback"}, interrupt_after="feedback")
         feedback = response['messages'][-1]['content']
-        st.session_state.feedbacks.append(feedback)
-        st.session_state.messages.append(AIMessage(content=feedback))
+        st.session_state.messages.append({"role": "assistant", "content": feedback})
         st.session_state.stage = "confirm_next"
         st.rerun()
 
@@ -162,7 +261,6 @@ def render_confirm_next(st):
     with col2:
         if st.button("🛑 그만할게요"):
             st.session_state.stage = "summary"
-            st.session_state.graph_state["is_summary"] = True
             st.rerun()
 
 
@@ -174,13 +272,11 @@ def render_summary(st, graph):
         st: The Streamlit module for UI rendering.
         graph: The workflow StateGraph instance managing the interview process.
     """
+    st.markdown("### 📋 면접 피드백 요약")
     with st.spinner("당신의 답변을 바탕으로 부족한 부분을 요약 중입니다..."):
-        graph.update_state(values=st.session_state.graph_state,
+        graph.update_state(values={"is_summary": True},
                            config=st.session_state.graph_config)
-        response = graph.invoke(None, config=st.session_state.graph_config)
-        summary = response['messages'][-1]['content']
-        st.markdown("### 📋 면접 피드백 요약")
-        st.markdown(summary)
+        stream_graph(st, graph, None, {"summary"})
 
 
 def render_ui(st, graph, page_title="나의 면접관"):
@@ -205,13 +301,18 @@ def render_ui(st, graph, page_title="나의 면접관"):
 
     if stage == "select_topic":
         render_select_topic(st)
-    elif stage == "ask":
-        render_ask(st, graph)
-    elif stage == "wait_answer":
-        render_messages(st)
-        render_wait_answer(st, graph)
-    elif stage == "confirm_next":
-        render_messages(st)
-        render_confirm_next(st)
     elif stage == "summary":
         render_summary(st, graph)
+    else:
+        # The history is drawn once per run; new messages are appended to the
+        # same container, and a new question is followed by the answer input
+        # without another rerun.
+        history = st.container()
+        with history:
+            render_messages(st)
+        if st.session_state.stage == "ask":
+            render_ask(st, graph, history)
+        if st.session_state.stage == "wait_answer":
+            render_wait_answer(st, graph, history)
+        if st.session_state.stage == "confirm_next":
+            render_confirm_next(st)
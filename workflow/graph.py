@@ -3,12 +3,14 @@ Module to create and compile the interview workflow graph
 using StateGraph with defined agents and conditional transitions.
 """
 
+import streamlit as st
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import StateGraph, END, START
 
 from workflow.node import ask_agent, feedback_agent, summary_agent
 from workflow.state import InterviewState
 
+__all__ = ["create_graph", "get_graph"]
 
 
 def create_graph() -> StateGraph:
@@ -53,9 +55,7 @@ def create_graph() -> StateGraph:
     )
 
 
-graph = create_graph()
-
-
+@st.cache_resource(show_spinner=False)
 def get_graph():
-    """Retrieve the compiled interview workflow graph."""
-    return graph
+    """Retrieve the compiled interview workflow graph, compiled once per process."""
+    return create_graph()
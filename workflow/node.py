@@ -3,92 +3,198 @@ Interview agents module: defines functions for asking questions, giving feedback
 and summarizing interview sessions using LLM and vector search.
 """
 
-from langchain.agents import load_tools, initialize_agent, AgentType
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict
+
 from langchain.schema import HumanMessage, SystemMessage, AIMessage
+from langchain_community.agent_toolkits.load_tools import load_tools
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts.few_shot import FewShotPromptTemplate
-from langchain_core.prompts import PromptTemplate
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder, PromptTemplate
 
-from config.parameters import get_llm
-from rag.vector_store import load_faiss
+from config.parameters import USE_LOOKUP_TOOLS, get_llm
+from rag.vector_store import index_version, search_by_keywords
 
 from .state import InterviewState
 
+# Seconds to wait for each arxiv/wikipedia lookup.
+LOOKUP_TIMEOUT = 10
+
+logger = logging.getLogger(__name__)
+
+# Lookups that timed out but whose thread is still running. The tool clients
+# make HTTP calls without a timeout, so such a thread may never finish.
+_ABANDONED_LOOKUPS = set()
+
+# Question prompt; static, so it is built once at import.
+_ASK_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """
+    당신은 전문적인 기술 면접관입니다.
+    뛰어난 인재를 선발하기 위해 이력서 기반으로 날카로운 질문을 합니다.
+    """),
+    MessagesPlaceholder("chat_history"),
+    ("human", """
+    아래 이력 정보를 참고해,  
+    다음 기술({tech_keywords}) 관련 정보를 알아보세요.
+    그 후 이력 정보와 연결하여 관련 면접 질문을 설명없이 한글로, 한 문장으로 생성하세요.
+    과거에 질문했던 질문은 하지 말아주세요.
+        
+    이력 정보:  
+    {context_text}
+    """),
+])
+
+# Few-shot feedback prompt; static, so it is built once at import.
+_FEEDBACK_PROMPT = FewShotPromptTemplate(
+    examples=[
+        {
+            "answer": "FastAPI에서 async/await을 사용해 LLM 호출을 병렬 처리했습니다.",
+            "feedback": "좋은 접근입니다. 어떤 방식으로 병렬화했는지 더 구체적으로 설명하면 더 좋겠습니다. 예: asyncio.gather 사용 여부 등"
+        },
+        {
+            "answer": "RAG 챗봇에서 LangChain을 썼어요.",
+            "feedback": (
+                "LangChain 사용 언급은 좋지만, 어떤 모듈을 사용했는지, "
+                 "chunk 전략이나 retriever 방식에 대한 구체적인 설명이 필요합니다."
+                )
+        },
+    ],
+    example_prompt=PromptTemplate(
+        input_variables=["answer", "feedback"],
+        template="지원자: {answer}\n피드백: {feedback}"
+    ),
+    prefix="지원자의 답변을 보고 피드백을 제공합니다.",
+    suffix="지원자: {user_answer}\n피드백:",
+    input_variables=["user_answer"],
+)
 
 
-def ask_agent(state: InterviewState) -> InterviewState:
+def _new_messages(*messages) -> Dict:
     """
-    Generate a technical interview question based on resume and conversation.
+    Build a partial state update appending `(role, content)` pairs to the raw
+    `messages` log and, in LangChain form, to `chat_history`, so agents never
+    have to convert the whole history again.
+    """
+    return {
+        "messages": [{"role": role, "content": content} for role, content in messages],
+        "chat_history": [
+            AIMessage(content=content) if role == "assistant"
+            else HumanMessage(content=f"{role}: {content}")
+            for role, content in messages
+        ],
+    }
+
+
+@lru_cache(maxsize=1)
+def _get_ask_chain():
+    """
+    Build the single-call question chain used by `ask_agent`, once per process.
+    """
+    return _ASK_PROMPT | get_llm() | StrOutputParser()
 
-    Args:
-        state (InterviewState): Current interview state including messages and keywords.
 
-    Returns:
-        InterviewState: Updated interview state with a new question added.
+@lru_cache(maxsize=1)
+def _get_lookup_tools():
+    """
+    Load the arxiv/wikipedia tools used when `USE_LOOKUP_TOOLS` is set, once per process.
     """
+    return load_tools(tool_names=["arxiv", "wikipedia"])
 
-    system_prompt = """
-    당신은 전문적인 기술 면접관입니다.
-    뛰어난 인재를 선발하기 위해 이력서 기반으로 날카로운 질문을 합니다.
+
+async def _lookup_keywords(query):
     """
+    Query all lookup tools concurrently, so the lookup takes as long as the
+    slowest tool rather than the sum of all of them.
+
+    The tools only block, so each lookup runs them on a pool of its own. Unlike
+    the event loop's default executor, `asyncio.run` does not wait for that pool
+    on exit, and a request that hangs past `LOOKUP_TIMEOUT` keeps only its own
+    thread busy instead of starving later lookups.
 
-    messages = [SystemMessage(content=system_prompt)]
+    Returns:
+        str: The results of the tools that answered within `LOOKUP_TIMEOUT` seconds.
+    """
+    tools = _get_lookup_tools()
+    executor = ThreadPoolExecutor(max_workers=len(tools), thread_name_prefix="lookup")
+    futures = [executor.submit(tool.run, query) for tool in tools]
+    executor.shutdown(wait=False)
+    results = await asyncio.gather(
+        *(asyncio.wait_for(asyncio.wrap_future(future), LOOKUP_TIMEOUT) for future in futures),
+        return_exceptions=True
+        )
 
-    for message in state["messages"]:
-        if message["role"] == "assistant":
-            messages.append(AIMessage(content=message["content"]))
+    references = []
+    for tool, future, result in zip(tools, futures, results):
+        if isinstance(result, asyncio.TimeoutError) and not future.done():
+            _ABANDONED_LOOKUPS.add(future)
+            future.add_done_callback(_ABANDONED_LOOKUPS.discard)
+            logger.warning("%s lookup for %r timed out after %ss; abandoning its thread "
+                           "(%d abandoned lookup threads still running)",
+                           tool.name, query, LOOKUP_TIMEOUT, len(_ABANDONED_LOOKUPS))
+        elif isinstance(result, BaseException):
+            logger.warning("%s lookup for %r failed: %r", tool.name, query, result)
         else:
-            messages.append(
-                HumanMessage(content=f"{message['role']}: {message['content']}")
-            )
+            references.append(result)
+    return "\n\n".join(references)
+
+
+def _retrieve_context(tech_keywords):
+    """
+    Build the context block of the question prompt for `tech_keywords`: the
+    matching resume chunks and, if `USE_LOOKUP_TOOLS` is set, arxiv/wikipedia results.
+    """
     try:
-        db = load_faiss()
-        retriever = db.as_retriever(search_kwargs={"k": 3})
-        context_docs = retriever.get_relevant_documents(" ".join(state["tech_keywords"]))
+        context_docs = search_by_keywords(tech_keywords)
         context = "\n\n".join(doc.page_content for doc in context_docs)
         context_text = f"""다음은 지원자의 이력 기반 정보입니다:\n{context}"""
     except FileNotFoundError:
         context_text = "지원자의 문서 기반 정보가 없습니다. 기술 키워드만 참고하세요."
 
+    if USE_LOOKUP_TOOLS:
+        references = asyncio.run(_lookup_keywords(" ".join(tech_keywords)))
+        if references:
+            context_text += f"""\n\n다음은 기술 관련 참고 자료입니다:\n{references}"""
+    return context_text
 
-    prompt = f"""
-    아래 이력 정보를 참고해,  
-    다음 기술({", ".join(state["tech_keywords"])}) 관련 정보를 알아보세요.
-    그 후 이력 정보와 연결하여 관련 면접 질문을 설명없이 한글로, 한 문장으로 생성하세요.
-    과거에 질문했던 질문은 하지 말아주세요.
-        
-    이력 정보:  
-    {context_text}
+
+def ask_agent(state: InterviewState) -> Dict:
     """
+    Generate a technical interview question based on resume and conversation.
 
-    messages.append(HumanMessage(content=prompt))
+    Args:
+        state (InterviewState): Current interview state including messages and keywords.
 
-    try:
-        tools = load_tools(tool_names=["arxiv", "wikipedia"], llm=get_llm())
-        agent = initialize_agent(
-            tools=tools, 
-            llm=get_llm(),
-            agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-            max_iterations=3,
-            max_execution_time=10,
-            verbose=False
-        )
-        response = agent.invoke(messages)
-        output = response['output']
-        if "Agent stopped due to iteration limit or time limit" in response['output']:
-            output = 'ERROR'
-    except (ConnectionError, RuntimeError):
-        output = 'ERROR'
+    Returns:
+        Dict: Partial state update appending the new question and caching the context.
+    """
+
+    # The keywords are fixed for the session, so the context is only retrieved
+    # again when a new document has been uploaded since the last question.
+    version = index_version()
+    if state.get("tech_context") and state.get("context_version") == version:
+        context_text = state["tech_context"]
+    else:
+        context_text = _retrieve_context(state["tech_keywords"])
 
-    if output == 'ERROR':
-        response = get_llm().invoke(messages)
-        output = response.content
+    prompt_values = {
+        "chat_history": state["chat_history"],
+        "tech_keywords": ", ".join(state["tech_keywords"]),
+        "context_text": context_text,
+    }
 
-    new_state = state.copy()
-    new_state["messages"].append({"role": "interviewer", "content": output})
-    return new_state
+    output = _get_ask_chain().invoke(prompt_values)
 
+    return {
+        **_new_messages(("interviewer", output)),
+        "tech_context": context_text,
+        "context_version": version,
+    }
 
-def feedback_agent(state: InterviewState) -> InterviewState:
+
+def feedback_agent(state: InterviewState) -> Dict:
     """
     Provide feedback on candidate's answers using few-shot prompting.
 
@@ -96,62 +202,23 @@ def feedback_agent(state: InterviewState) -> InterviewState:
         state (InterviewState): Current interview state including user input and message history.
 
     Returns:
-        InterviewState: Updated interview state with feedback added.
+        Dict: Partial state update appending the answer and its feedback.
     """
 
     system_prompt = """
     당신은 전문적인 기술 면접관이자 강사입니다.
     취업준비생들에게 조언을 해주기 위해 질문/답변들을 토대로 조언을 해줍니다.
     """
-    messages = [SystemMessage(content=system_prompt)]
-    # state에서 메시지 가져오기
-    for message in state["messages"]:
-        if message["role"] == "assistant":
-            messages.append(AIMessage(content=message["content"]))
-        else:
-            messages.append(
-                HumanMessage(content=f"{message['role']}: {message['content']}")
-            )
+    messages = [SystemMessage(content=system_prompt), *state["chat_history"]]
 
-    examples = [
-        {
-            "answer": "FastAPI에서 async/await을 사용해 LLM 호출을 병렬 처리했습니다.",
-            "feedback": "좋은 접근입니다. 어떤 방식으로 병렬화했는지 더 구체적으로 설명하면 더 좋겠습니다. 예: asyncio.gather 사용 여부 등"
-        },
-        {
-            "answer": "RAG 챗봇에서 LangChain을 썼어요.",
-            "feedback": (
-                "LangChain 사용 언급은 좋지만, 어떤 모듈을 사용했는지, "
-                 "chunk 전략이나 retriever 방식에 대한 구체적인 설명이 필요합니다."
-                )
-        },
-    ]
-
-    example_prompt = PromptTemplate(
-        input_variables=["answer", "feedback"],
-        template="지원자: {answer}\n피드백: {feedback}"
-    )
-
-    fewshot_prompt = FewShotPromptTemplate(
-        examples=examples,
-        example_prompt=example_prompt,
-        prefix="지원자의 답변을 보고 피드백을 제공합니다.",
-        suffix="지원자: {user_answer}\n피드백:",
-        input_variables=["user_answer"],
-    )
-    messages.append(HumanMessage(content=fewshot_prompt.invoke(
-        {"user_answer": state["user_input"]}).to_string())
-        )
+    messages.append(HumanMessage(content=_FEEDBACK_PROMPT.format(user_answer=state["user_input"])))
 
     response = get_llm().invoke(messages)
 
-    new_state = state.copy()
-    new_state["messages"].append({"role": "applicant", "content": state["user_input"]})
-    new_state["messages"].append({"role": "feedback", "content": response.content})
-    return new_state
+    return _new_messages(("applicant", state["user_input"]), ("feedback", response.content))
 
 
-def summary_agent(state: InterviewState) -> InterviewState:
+def summary_agent(state: InterviewState) -> Dict:
     """
     Summarize technical weaknesses and improvements from the session.
 
@@ -159,22 +226,14 @@ def summary_agent(state: InterviewState) -> InterviewState:
         state (InterviewState): Current interview state including message history.
 
     Returns:
-        InterviewState: Updated interview state with summary added.
+        Dict: Partial state update appending the summary.
     """
 
     system_prompt = """
     당신은 전문적인 기술 면접관입니다.
     """
 
-    messages = [SystemMessage(content=system_prompt)]
-
-    for message in state["messages"]:
-        if message["role"] == "assistant":
-            messages.append(AIMessage(content=message["content"]))
-        else:
-            messages.append(
-                HumanMessage(content=f"{message['role']}: {message['content']}")
-            )
+    messages = [SystemMessage(content=system_prompt), *state["chat_history"]]
 
     prompt = """
         위의 내용은 사용자 질문/답변/피드백의 기록입니다. 이 데이터를 바탕으로 사용자의 기술적 약점과 개선점을 요약해주세요.
@@ -185,7 +244,4 @@ def summary_agent(state: InterviewState) -> InterviewState:
         HumanMessage(content=prompt)
     )
     response = get_llm().invoke(messages)
-    new_state = state.copy()
-
-    new_state["messages"].append({"role": "summarier", "content": response.content})
-    return new_state
+    return _new_messages(("summarier", response.content))
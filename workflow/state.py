@@ -7,7 +7,12 @@ Includes:
 - InterviewState: TypedDict describing the shape of the interview state data.
 """
 
-from typing import Dict, List, TypedDict
+from operator import add
+from typing import Annotated, Dict, List, Optional, TypedDict
+
+from langchain_core.messages import BaseMessage
+
+__all__ = ["CurrentStep", "InterviewState"]
 
 
 class CurrentStep:
@@ -25,14 +30,24 @@ class InterviewState(TypedDict):
     """
     TypedDict describing the structure of the interview state.
 
+    `messages` and `chat_history` use the `add` reducer, so nodes return only
+    the messages they produce and LangGraph appends them.
+
     Attributes:
         messages (List[Dict]): List of message dictionaries containing roles and contents.
+        chat_history (List[BaseMessage]): The same messages converted to LangChain messages,
+            appended incrementally alongside `messages`.
         tech_keywords (List[str]): List of technical keywords relevant to the interview.
+        tech_context (str): Resume context retrieved for `tech_keywords`, reused across questions.
+        context_version (float | None): Vector store version `tech_context` was retrieved from.
         is_summary (bool): Flag indicating if the current step is the summary phase.
         user_input (str): The latest input from the user.
     """
 
-    messages: List[Dict]
+    messages: Annotated[List[Dict], add]
+    chat_history: Annotated[List[BaseMessage], add]
     tech_keywords: List[str]
+    tech_context: str
+    context_version: Optional[float]
     is_summary: bool
     user_input: str